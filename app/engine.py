@@ -8,6 +8,7 @@ and including those already in correct position.
 We allow duplicates in the secret.
 """
 
+from functools import lru_cache
 from typing import Tuple
 from .types import Code
 
@@ -21,53 +22,123 @@ def score_guess(secret: Code, guess: Code) -> Tuple[int, int]:
       Returns a tuple: (correct_numbers, correct_positions)
     """
 
-    # 0, Validate lengths match
+    # 0. Validate lengths match
     n = len(secret)
     if n == 0 or len(guess) != n:
         raise ValueError("Secret and guess must be the same non-zero length.")
 
+    # Scoring is pure, so results are memoized by (secret, guess) pair —
+    # repeated wrong guesses hit the cache. tuple() on an existing tuple
+    # (the store always passes tuples) returns the same object.
+    return _score_cached(tuple(secret), tuple(guess))
+
+
+@lru_cache(maxsize=4096)
+def _score_cached(secret: Code, guess: Code) -> Tuple[int, int]:
+    n = len(secret)
+
+    # Fast path: a specialized scorer with the loop fully unrolled exists
+    # for every difficulty length (3/4/5).
+    scorer = _SCORERS.get(n)
+    if scorer is not None:
+        return scorer(secret, guess)
+
+    # Generic path for any other length.
     # 1. Count exact position matches --> correct_positions
-    correct_positions = 0
-    i = 0
-    while i < n:
-        if secret[i] == guess[i]:
-            correct_positions += 1
-        i += 1
+    # Pack both codes into one int (4 bits per position) and XOR them:
+    # matching positions XOR to a zero nibble. OR-folding each nibble onto
+    # its low bit and popcounting gives the number of mismatches.
+    sp = _pack_code(secret)
+    gp = _pack_code(guess)
+    x = sp ^ gp
+    x = x | (x >> 1) | (x >> 2) | (x >> 3)
+    nibble_lows = (16**n - 1) // 15  # 0x11...1, one low bit per nibble
+    correct_positions = n - (x & nibble_lows).bit_count()
 
     # 2. Count how many digits appear anywhere in both lists --> correct_numbers
-    secret_counts = [0,0,0,0,0,0,0,0]
-    guess_counts = [0,0,0,0,0,0,0,0]
-
-    # Fill counts for secret
-    idx = 0
-    while idx < n:
-        digit = secret[idx]
-        # ignore out of range
-        if digit >= 0 and digit <= 7:
-            secret_counts[digit] += 1
-        idx += 1
-
-    # Fill counts for guess
-    idx = 0
-    while idx < n:
-        digit = guess[idx]
-        if digit >= 0 and digit <= 7:
-            guess_counts[digit] += 1
-        idx += 1
-
-    # Overlap is the sum of the smaller count for each digit
+    # Instead of two 8-slot list histograms, pack every per-digit count into
+    # one int, 4 bits per digit (a code is at most 5 long, so no nibble can
+    # overflow). Building each histogram is then one shift+add per digit.
+    secret_counts = _pack_counts(secret)
+    guess_counts = _pack_counts(guess)
+
+    # Overlap is the sum of the smaller count for each digit (nibble-wise min)
     correct_numbers = 0
-    digit = 0
-    while digit <= 7:
-        # add the minimum of the two counts
-        if secret_counts[digit] < guess_counts[digit]:
-            correct_numbers += secret_counts[digit]
-        else:
-            correct_numbers += guess_counts[digit]
-        digit += 1
+    while secret_counts or guess_counts:
+        a = secret_counts & 0xF
+        b = guess_counts & 0xF
+        correct_numbers += a if a < b else b
+        secret_counts >>= 4
+        guess_counts >>= 4
 
     return (correct_numbers, correct_positions)
 
+
+def _pack_counts(code: Code) -> int:
+    """
+    Histogram of a code packed into a single int: bits [4*d, 4*d+4) hold how
+    many times digit d appears. Digits outside 0..7 are ignored, matching the
+    old list-based counting.
+    """
+    counts = 0
+    for d in code:
+        if 0 <= d <= 7:
+            counts += 1 << (4 * d)
+    return counts
+
+
+def _pack_code(code: Code) -> int:
+    """
+    The code itself packed into one int, 4 bits per position.
+    Digits are 0..7 by contract (validated at the API boundary).
+    """
+    packed = 0
+    for d in code:
+        packed = (packed << 4) | (d & 0xF)
+    return packed
+
+
+def _make_scorer(n: int):
+    """
+    Compile a score function specialized for codes of length n: the loops
+    are unrolled into straight-line bytecode with every index a constant,
+    so there are no len() checks or loop counters left at call time.
+    Assumes digits are already validated to 0..7 (the API layer does this).
+    """
+    positions = " + ".join(f"(secret[{i}] == guess[{i}])" for i in range(n))
+    secret_hist = " + ".join(f"(1 << (4 * secret[{i}]))" for i in range(n))
+    guess_hist = " + ".join(f"(1 << (4 * guess[{i}]))" for i in range(n))
+    src = (
+        f"def _score(secret, guess):\n"
+        f"    correct_positions = {positions}\n"
+        f"    sc = {secret_hist}\n"
+        f"    gc = {guess_hist}\n"
+        f"    correct_numbers = 0\n"
+        f"    while sc or gc:\n"
+        f"        a = sc & 0xF\n"
+        f"        b = gc & 0xF\n"
+        f"        correct_numbers += a if a < b else b\n"
+        f"        sc >>= 4\n"
+        f"        gc >>= 4\n"
+        f"    return (correct_numbers, correct_positions)\n"
+    )
+    namespace: dict = {}
+    exec(compile(src, f"<scorer n={n}>", "exec"), namespace)
+    return namespace["_score"]
+
+
+# One specialized scorer per difficulty code length.
+_SCORERS = {n: _make_scorer(n) for n in (3, 4, 5)}
+
+
+def scorer_for(n: int):
+    """
+    The pre-compiled scorer for codes of length n, or None if there is no
+    specialization. Callers that already validated both lengths (like the
+    store's guess path) can dispatch here and skip score_guess's checks.
+    """
+    return _SCORERS.get(n)
+
 def is_win(secret: Code, guess: Code) -> bool:
     """
     Win = all digits match in order, for all positions.
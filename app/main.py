@@ -12,10 +12,13 @@ Extension 3:
 GET /games/{game_id}/hint -> get hint
 '''
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from time import monotonic
 
 from .random_client import fetch_code
 from .store import GameStore
@@ -29,7 +32,9 @@ from .schemas import (
     HintOut,  # Extension 3
 )
 
-app = FastAPI(title="Mastermind API", version="1.0.0")
+# orjson renders responses several times faster than the stdlib encoder,
+# which matters most for GameState payloads carrying a full history
+app = FastAPI(title="Mastermind API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Allow everything in dev so the docs and front-end work easily
 app.add_middleware(
@@ -40,11 +45,32 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Static assets: fonts and images never change, so browsers may cache them
+# for a year; index.html and app.js are not content-hashed, so they must be
+# revalidated (StaticFiles already sends ETag/Last-Modified for that).
+@app.middleware("http")
+async def static_cache_headers(request, call_next):
+    response = await call_next(request)
+    path = request.url.path
+    if response.status_code == 200:
+        if path.startswith("/fonts/") or path.startswith("/img/"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        elif path == "/" or path.endswith((".html", ".js")):
+            response.headers["Cache-Control"] = "no-cache"
+    return response
+
 # Manage game state in memory
 store = GameStore()
 
+# Extension #1: difficulty presets -> (code length, attempts)
+PRESETS = {
+    "easy":   (3, 8),
+    "medium": (4, 10),
+    "hard":   (5, 12),
+}
+
 @app.post("/games", response_model=NewGameResponse, summary="Start a new game")
-def start_game(difficulty: str = "medium") -> NewGameResponse:
+async def start_game(difficulty: str = "medium") -> NewGameResponse:
     """
     Extension #1:
     Start a new game with difficulty level.
@@ -52,19 +78,13 @@ def start_game(difficulty: str = "medium") -> NewGameResponse:
     - medium: length=4, attempts=10 (default)
     - hard:   length=5, attempts=12
     """
-    if difficulty == "easy":
-        length = 3
-        attempts = 8
-    elif difficulty == "hard":
-        length = 5
-        attempts = 12
-    else:
+    if difficulty not in PRESETS:
         difficulty = "medium"
-        length = 4
-        attempts = 10
+    length, attempts = PRESETS[difficulty]
 
-    # Generate secret of variable length
-    secret = fetch_code(length)
+    # Generate secret of variable length.
+    # fetch_code can block on a network call, so keep it off the event loop.
+    secret = await run_in_threadpool(fetch_code, length)
 
     # Create game in store with attempts set
     game = store.create(secret, attempts, difficulty)
@@ -77,26 +97,24 @@ def start_game(difficulty: str = "medium") -> NewGameResponse:
     )
 
 @app.get("/games/{game_id}", response_model=GameState, summary="Get current game state")
-def get_game(game_id: str) -> GameState:
+async def get_game(game_id: str) -> GameState:
     game = store.get(game_id)
     if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Convert internal history into API-friendly objects (DTOs)
+    # (game.entries is the filled part of the preallocated history)
     history_out: list[GuessEntryOut] = []
-    i = 0
-    while i < len(game.history):
-        guess_entry = game.history[i] # one past guess
+    for guess_entry in game.entries:
         history_out.append(
             GuessEntryOut(
                 guess=guess_entry.guess,
                 correct_numbers=guess_entry.correct_numbers,
                 correct_positions=guess_entry.correct_positions,
                 message=guess_entry.message,
-                timestamp=guess_entry.timestamp,
+                timestamp=guess_entry.timestamp / 1e9,
             )
         )
-        i += 1
 
     return GameState(
         game_id=game.id,
@@ -107,15 +125,22 @@ def get_game(game_id: str) -> GameState:
     )
 
 @app.post("/games/{game_id}/guess", response_model=GuessResponse, summary="Submit a guess")
-def submit_guess(game_id: str, payload: GuessRequest) -> GuessResponse:
-    # 1. Get game first
-    game = store.get(game_id)
+async def submit_guess(game_id: str, payload: GuessRequest) -> GuessResponse:
+    # 1. Apply the guess in a single store call. store.guess handles every
+    #    state itself: missing game (None), finished game (returned as-is,
+    #    attempts untouched), and wrong-length guess (ValueError).
+    try:
+        game = store.guess(game_id, payload.guess)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
     if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # 2) If already finished, reveal secret and return a clear note
+    # 2) Finished game — either this guess ended it or it was already over.
+    #    Reveal the secret and return the latest feedback with a clear note.
     if game.status != "in_progress":
-        last = game.history[-1] if game.history else None
+        last = game.last_entry
         return GuessResponse(
             attempts_left=game.attempts_left,
             status=game.status,
@@ -124,50 +149,18 @@ def submit_guess(game_id: str, payload: GuessRequest) -> GuessResponse:
                 correct_numbers=last.correct_numbers,
                 correct_positions=last.correct_positions,
                 message=last.message,
-                timestamp=last.timestamp,
+                timestamp=last.timestamp / 1e9,
             ) if last else None,
             secret=game.secret,
             note=f"Game {game.status}. No more guesses allowed.",
         )
 
-    # Extension #1 - Length check
-    required_length = len(game.secret)
-    if len(payload.guess) != required_length:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Your guess must have exactly {required_length} digits for this difficulty."
-        )
-
-    # 3. Apply the guess once (this decrements attempts and appends feedback)
-    try:
-        game = store.guess(game_id, payload.guess)
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
-
-    # 4. Defensive: ensure feedback exists
-    if not game.history:
+    # 3. Defensive: ensure feedback exists
+    feedback = game.last_entry
+    if feedback is None:
         raise HTTPException(status_code=500, detail="Internal error: no feedback recorded")
 
-    # The most recent history item is the feedback for this guess
-    feedback = game.history[-1]
-
-    # 5) If this guess ended the game, include secret + note
-    if game.status != "in_progress":
-        return GuessResponse(
-            attempts_left=game.attempts_left,
-            status=game.status,
-            feedback=GuessEntryOut(
-                guess=feedback.guess,
-                correct_numbers=feedback.correct_numbers,
-                correct_positions=feedback.correct_positions,
-                message=feedback.message,
-                timestamp=feedback.timestamp,
-            ),
-            secret=game.secret,
-            note=f"Game {game.status}. No more guesses allowed.",
-        )
-
-    # 6. Otherwise, normal in-progress response
+    # 4. Normal in-progress response
     return GuessResponse(
         attempts_left=game.attempts_left,
         status=game.status,
@@ -176,19 +169,32 @@ def submit_guess(game_id: str, payload: GuessRequest) -> GuessResponse:
             correct_numbers=feedback.correct_numbers,
             correct_positions=feedback.correct_positions,
             message=feedback.message,
-            timestamp=feedback.timestamp,
+            timestamp=feedback.timestamp / 1e9,
         ),
     )
 
-# Extension 2: Endpoint to view scoreboard
+# Extension 2: Endpoint to view scoreboard.
+# Scoreboards are polled far more often than they change, so we keep the
+# last response for a couple of seconds and tell clients to do the same.
+_STATS_TTL_SECONDS = 2.0
+_stats_cache: tuple[float, StatsOut] | None = None
+
 @app.get("/stats", response_model = StatsOut, summary="Get per-session scoreboard")
-def get_stats() -> StatsOut:
+async def get_stats(response: Response) -> StatsOut:
+    global _stats_cache
+
+    response.headers["Cache-Control"] = f"max-age={int(_STATS_TTL_SECONDS)}"
+
+    cached = _stats_cache
+    if cached is not None and monotonic() - cached[0] < _STATS_TTL_SECONDS:
+        return cached[1]
+
     stats = store.get_stats()
     average = None
     if stats.games_won > 0:
         average = stats.total_guesses_in_wins / stats.games_won
 
-    return StatsOut(
+    out = StatsOut(
         games_started=stats.games_started,
         games_won=stats.games_won,
         games_lost=stats.games_lost,
@@ -203,16 +209,20 @@ def get_stats() -> StatsOut:
         medium_won=stats.medium_won,
         hard_won=stats.hard_won,
     )
+    _stats_cache = (monotonic(), out)
+    return out
 
 # Extension 2: Endpoint to reset scoreboard
 @app.post("/stats/reset", summary="Reset the scoreboard")
-def reset_stats() -> dict:
+async def reset_stats() -> dict:
+    global _stats_cache
     store.reset_stats()
+    _stats_cache = None
     return {"message": "Stats reset for this server session."}
 
 # Extension 3: Get a hint
 @app.get("/games/{game_id}/hint", response_model=HintOut, summary="Get a one-time hint: Reveals one digit/position")
-def get_hint(game_id: str) -> HintOut:
+async def get_hint(game_id: str) -> HintOut:
     result = store.give_hint(game_id)
     status = result[0]
     data = result[1]
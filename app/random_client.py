@@ -1,73 +1,148 @@
 """
 - HTTP call with clear fallback
-Get 4 random digits (0..7) from random.org. If anything goes wrong (no internet,
-timeout, bad response), we fall back to a local secure random generator so the game still works.
+Get random digits (0..7) from random.org. Digits are fetched in large
+batches into an in-process buffer, so most games are served without any
+network call at all. If anything goes wrong (no internet, timeout, bad
+response), we fall back to a local secure random generator so the game
+still works.
 """
 
 import os
 import requests
-from secrets import randbelow
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from threading import Lock, Thread
 from typing import List
+from urllib.parse import urlencode
 
 RANDOM_URL = "https://www.random.org/integers/"
 
-def fetch_code(length: int = 4) -> List[int]:
-    # Parameters to send to random.org
-    params = {
-        "num": length,     # how many numbers we want -> Extension #1
-        "min": 0,          # smallest allowed number
-        "max": 7,          # largest allowed number
-        "col": 1,          # one number per line
-        "base": 10,        # normal decimal numbers
-        "format": "plain", # plain text response
-        "rnd": "new",      # always generate new numbers
-    }
-
-    # keep network quick; if it takes too long, we will just fallback
-    timeout_seconds = 3.0
+# Fixed query parameters for random.org, built once at import.
+# Only "num" varies per call.
+_BASE_PARAMS = {
+    "min": 0,          # smallest allowed number
+    "max": 7,          # largest allowed number
+    "col": 1,          # one number per line
+    "base": 10,        # normal decimal numbers
+    "format": "plain", # plain text response
+    "rnd": "new",      # always generate new numbers
+}
+
+# One shared Session so keep-alive reuses the TCP+TLS connection across
+# games instead of paying a fresh handshake on every POST /games.
+# Transient 5xx responses are retried by urllib3 with a short backoff
+# before we give up and use the local fallback.
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+    ),
+)
+_session.headers.update({"Connection": "keep-alive", "Accept": "text/plain"})
+
+# Ring buffer of prefetched digits: one HTTP call for _REFILL_AMOUNT digits
+# serves ~100 games, instead of one call per game. When the buffer drops
+# below _REFILL_THRESHOLD, a daemon thread tops it up so game creation
+# never has to wait on random.org once the buffer is warm.
+_REFILL_AMOUNT = 512
+_REFILL_THRESHOLD = 32
 
+# Fully-encoded request URLs for the batch sizes we actually use (one per
+# difficulty length plus the refill batch), so the hot path skips the
+# per-call dict merge and urlencode.
+_URL_BY_NUM = {
+    n: f"{RANDOM_URL}?{urlencode({**_BASE_PARAMS, 'num': n})}"
+    for n in (3, 4, 5, _REFILL_AMOUNT)
+}
+_buffer: deque = deque()
+_buffer_lock = Lock()
+_refill_running = False
+
+
+def _refill() -> None:
+    """Fetch one batch into the buffer; network errors are swallowed."""
+    global _refill_running
     try:
-        # Make the HTTP request to random.org
-        response = requests.get(RANDOM_URL, params=params, timeout=timeout_seconds)
-
-        # If the response was not 200 OK, this will raise an error
-        response.raise_for_status()
-
-        # The body looks like:
-        #   0\n3\n1\n2\n
-        lines = response.text.splitlines()
-
-        # Convert each line into an integer
-        digits = []
-        i = 0
-        while i < len(lines):
-            text = lines[i].strip()
-            if text != "":
-                # Turn the text into a number
-                value = int(text)
-                digits.append(value)
-            i += 1
-
-        # Check that we got exactly the requested number of digits
-        if len(digits) != length:
-            raise ValueError(f"random.org returned {len(digits)} values, expected {length}.")
-
-        # Check each number is between 0 and 7
-        j = 0
-        while j < 4:
-            if digits[j] < 0 or digits[j] > 7:
-                raise ValueError("random.org number out of range 0..7.")
-            j += 1
-
-        # Everything looks good
-        return digits
+        digits = _fetch_digits(_REFILL_AMOUNT)
+    except Exception:
+        digits = None
+    with _buffer_lock:
+        if digits:
+            _buffer.extend(digits)
+        _refill_running = False
+
+
+def _fetch_digits(num: int) -> List[int]:
+    """
+    One HTTP round trip to random.org for `num` digits.
+    Raises on any network / parsing problem; callers handle the fallback.
+    """
+    # Use the pre-encoded URL when we have one ("num" = how many numbers)
+    url = _URL_BY_NUM.get(num)
+    if url is None:
+        url = f"{RANDOM_URL}?{urlencode({**_BASE_PARAMS, 'num': num})}"
+
+    # Keep network quick; if it takes too long, we will just fallback.
+    # Split (connect, read) timeouts: a stalled TLS handshake gives up
+    # after 0.5s instead of eating the whole budget before the read starts.
+    timeout = (0.5, 1.5)
+
+    # Make the HTTP request to random.org
+    response = _session.get(url, timeout=timeout)
+
+    # Fail fast into the fallback on any non-200 without building an
+    # HTTPError (the caller's except catches ValueError the same way)
+    if response.status_code != 200:
+        raise ValueError(f"random.org returned HTTP {response.status_code}")
 
+    # The body looks like:
+    #   0\n3\n1\n2\n
+    # str.split + map(int) keep the whole parse in C — this matters now
+    # that a refill parses 512 lines, not 4. Decoding as ASCII directly
+    # skips the charset detection behind response.text.
+    digits = list(map(int, response.content.decode("ascii").split()))
+
+    # Check that we got exactly the requested number of digits
+    if len(digits) != num:
+        raise ValueError(f"random.org returned {len(digits)} values, expected {num}.")
+
+    # Check every number is between 0 and 7
+    if min(digits) < 0 or max(digits) > 7:
+        raise ValueError("random.org number out of range 0..7.")
+
+    # Everything looks good
+    return digits
+
+
+def fetch_code(length: int = 4) -> List[int]:
+    global _refill_running
+
+    code = None
+    start_refill = False
+    with _buffer_lock:
+        if len(_buffer) >= length:
+            code = [_buffer.popleft() for _ in range(length)]
+        # Kick off a background top-up once we run low (at most one at a time)
+        if len(_buffer) < _REFILL_THRESHOLD and not _refill_running:
+            _refill_running = True
+            start_refill = True
+
+    if start_refill:
+        Thread(target=_refill, daemon=True).start()
+
+    if code is not None:
+        return code
+
+    # Buffer was empty (cold start or random.org down): fetch just this
+    # code synchronously while the background batch fills up.
+    try:
+        return _fetch_digits(length)
     except Exception:
-        # Fallback: if the request fails, use Python's secure random
-        # randbelow(8) gives us a number between 0 and 7
-        fallback_digits = []
-        k = 0
-        while k < length:
-            fallback_digits.append(randbelow(8))
-            k += 1
-        return fallback_digits
+        # Fallback: one os.urandom read covers the whole code. 8 is a power
+        # of two, so masking each byte with 0x07 is uniform over 0..7 with
+        # no rejection sampling needed.
+        return [b & 0x07 for b in os.urandom(length)]
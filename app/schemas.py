@@ -5,7 +5,7 @@ Explicit validation & Pydantic models
 - Defines the structure of API requests and responses.
 """
 
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 from pydantic import BaseModel, Field, field_validator
 
 # 1. Represents response when a new game is started
@@ -17,25 +17,29 @@ class NewGameResponse(BaseModel):
 
 # 2. Validates player's guess
 class GuessRequest(BaseModel):
-    guess: List[int] = Field(
-        ..., description="A list of digits (length depends on difficulty). Each digit must be between 0 and 7."
+    # Validated straight into a tuple: the store and engine work on tuples,
+    # so this skips a list->tuple conversion downstream. JSON clients still
+    # send a plain array.
+    guess: Tuple[int, ...] = Field(
+        ...,
+        min_length=3,
+        max_length=5,
+        description="A list of digits (length depends on difficulty). Each digit must be between 0 and 7.",
     )
 
     @field_validator("guess")
     @classmethod
-    def validate_digits(cls, guess_list: List[int]) -> List[int]:
+    def validate_digits(cls, guess_tuple: Tuple[int, ...]) -> Tuple[int, ...]:
         """
         We only check that each item is an integer between 0 and 7.
-        We do not check the length here because the length depends on the game's difficulty.
-        The route will check the length against the game's secret.
+        The exact length depends on the game's difficulty: Pydantic enforces
+        the 3..5 envelope via min/max_length above (in Rust, before this
+        validator runs), and the store checks the exact length against the
+        game's secret.
         """
-        index = 0
-        while index < len(guess_list):
-            digit = guess_list[index]
-            if digit < 0 or digit > 7:
-                raise ValueError("Each digit must be between 0 and 7 inclusive.")
-            index += 1
-        return guess_list
+        if any(d < 0 or d > 7 for d in guess_tuple):
+            raise ValueError("Each digit must be between 0 and 7 inclusive.")
+        return guess_tuple
 
     model_config = {
         "json_schema_extra": {
@@ -5,42 +5,78 @@ Creates a game, fetches one by id, applies a guess, tracks attempts and history.
 Thread-safe so multiple requests don’t clash.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Dict, List, Optional
-from uuid import uuid4
-from time import time
-from threading import RLock
-from secrets import randbelow
+from itertools import count
+from time import time_ns
+from threading import Lock, local
+from secrets import token_hex
+from random import randrange
 
 from .types import Code, GameStatus, Difficulty
-from .engine import score_guess, is_win
+from .engine import score_guess, scorer_for
 
-@dataclass
+# slots=True drops the per-instance __dict__: a server holding thousands of
+# games (10+ history entries each) saves ~60 bytes per object and attribute
+# access goes through fixed slot descriptors instead of a dict probe.
+@dataclass(slots=True)
 class GuessEntry:
     guess: Code
     correct_numbers: int
     correct_positions: int
-    message: str
-    timestamp: float
+    # Integer epoch nanoseconds; the API layer converts to float seconds
+    timestamp: int
 
-@dataclass
+    @property
+    def message(self) -> str:
+        """
+        Feedback text for this entry. Built lazily from the score pair:
+        only serialization reads it, so guesses never pay for formatting.
+        """
+        key = (self.correct_numbers, self.correct_positions)
+        msg = _MSG.get(key)
+        if msg is None:
+            msg = f"{key[0]} correct number(s) and {key[1]} correct location(s)"
+        return msg
+
+@dataclass(slots=True)
 class Game:
     id: str
     secret: Code
     attempts_left: int = 10
     status: GameStatus = "in_progress"
+    # Preallocated to initial_attempts blank GuessEntry objects at create;
+    # n_entries marks how many are filled. Each guess reuses the next pooled
+    # entry in place, so the steady state allocates no history objects at all
     history: List[GuessEntry] = field(default_factory=list)
-    created_at: float = field(default_factory=time)
-    updated_at: float = field(default_factory=time)
+    n_entries: int = 0
+    created_at: int = field(default_factory=time_ns)
+    updated_at: int = field(default_factory=time_ns)
     # Extension 2: store starting attempts to calculate guesses used in wins
     initial_attempts: int = 10
+    # len(secret), cached once at create for the per-guess length checks
+    code_length: int = 0
+    # When the game reached "won"/"lost" (epoch ns); 0 while in progress
+    finished_at: int = 0
     difficulty: Difficulty = "medium"
     # Extension 3: get a hint
     hint_used: bool = False
     revealed_positions: List[int] = field(default_factory=list)
+    # Positions not yet revealed by a hint; give_hint swap-pops from here
+    unrevealed: List[int] = field(default_factory=list)
+
+    @property
+    def entries(self) -> List[GuessEntry]:
+        """The guesses actually made so far (the filled part of history)."""
+        return self.history[:self.n_entries]
+
+    @property
+    def last_entry(self) -> Optional[GuessEntry]:
+        """Feedback for the most recent guess, or None before any guess."""
+        return self.history[self.n_entries - 1] if self.n_entries else None
 
 # Extension 2: Scoreboard structure
-@dataclass
+@dataclass(slots=True)
 class Stats:
     games_started: int = 0
     games_won: int = 0
@@ -61,134 +97,286 @@ class Stats:
     hard_won: int = 0
 
 
+# Number of independent (lock, dict) pairs game state is split across
+_SHARD_COUNT = 16
+
+# Finished games older than this are moved out of the active shards into a
+# read-only archive, keeping the hot dicts small. Pruning runs lazily, once
+# every _PRUNE_EVERY creates.
+_PRUNE_AGE_NS = 3_600 * 1_000_000_000  # one hour
+_PRUNE_EVERY = 256
+
+# Every feedback message, precomputed: counts never exceed the longest code
+# (5), so the whole (correct_numbers, correct_positions) space is tiny and
+# GuessEntry.message can share one interned string instead of building its own.
+_MSG = {
+    (cn, cp): (
+        "all incorrect"
+        if cn == 0 and cp == 0
+        else f"{cn} correct number(s) and {cp} correct location(s)"
+    )
+    for cn in range(6)
+    for cp in range(6)
+}
+
+
 class GameStore:
     def __init__(self) -> None:
-        self._games: Dict[str, Game] = {}
-        # FastAPI can process multiple requests in parallel. Avoid race conditions
-        self._lock = RLock()
-        # Extension 2: initialize stats
+        # FastAPI can process multiple requests in parallel. Avoid race
+        # conditions, but do not serialize unrelated games on one global
+        # lock: games are sharded by id hash across _SHARD_COUNT dicts,
+        # each with its own plain Lock (no method re-enters a lock, so no
+        # RLock bookkeeping is needed).
+        self._shard_locks = [Lock() for _ in range(_SHARD_COUNT)]
+        # Game ids: an opaque random per-process prefix plus a counter.
+        # next() on itertools.count is atomic under the GIL and avoids a
+        # 16-byte urandom read per game the way uuid4 does.
+        self._id_prefix = token_hex(4)
+        self._id_counter = count(1)
+        self._shard_maps: List[Dict[str, Game]] = [{} for _ in range(_SHARD_COUNT)]
+        # Extension 2: initialize stats. Pure counters (started, wins,
+        # losses, guesses) accumulate in per-thread Stats deltas with no
+        # locking; only order-dependent state (streaks) stays on the shared
+        # Stats under _stats_lock. get_stats merges everything.
+        self._stats_lock = Lock()
         self._stats = Stats()
+        self._local = local()
+        self._thread_stats: List[Stats] = []
+        # Bumped on reset so stale per-thread deltas are abandoned
+        self._stats_epoch = 0
+        # Merged snapshot reused by get_stats until something changes.
+        # The dirty flag is a plain boolean store (atomic under the GIL),
+        # so writers never take a lock just to invalidate.
+        self._stats_cache: Optional[Stats] = None
+        self._stats_dirty = True
+        # Finished games pruned from the shards end up here (read-only)
+        self._archive: Dict[str, Game] = {}
+        self._archive_lock = Lock()
+
+    def _shard(self, game_id: str) -> int:
+        return hash(game_id) % _SHARD_COUNT
 
     def create(self, secret: Code, attempts: int, difficulty: Difficulty = "medium") -> Game:
-        new_id = str(uuid4())
+        seq = next(self._id_counter)
+        new_id = f"{self._id_prefix}-{seq:x}"
         game = Game(
             id=new_id,
-            secret=secret,
+            # Tuples are immutable and compare in C, so the win check below
+            # is a single tuple equality instead of a Python loop
+            secret=tuple(secret),
+            history=[GuessEntry((), 0, 0, 0) for _ in range(attempts)],
+            code_length=len(secret),
+            unrevealed=list(range(len(secret))),
             attempts_left=attempts,
             initial_attempts=attempts,  # Extension 2
             difficulty=difficulty,      # Extension 2
         )
-        with self._lock:
-            self._games[new_id] = game
-
-            # Extension 2: Update scoreboard when game is created
-            self._stats.games_started += 1
-            if difficulty == "easy":
-                self._stats.easy_started += 1
-            elif difficulty == "hard":
-                self._stats.hard_started += 1
-            else:
-                self._stats.medium_started += 1
+        i = self._shard(new_id)
+        with self._shard_locks[i]:
+            # Copy-on-write: readers see either the old or the new dict,
+            # never a dict mid-mutation, so get() needs no lock
+            updated = dict(self._shard_maps[i])
+            updated[new_id] = game
+            self._shard_maps[i] = updated
+
+        # Extension 2: Update scoreboard when game is created. The started
+        # counters go through this thread's private delta — += on a shared
+        # int is load/add/store and can lose updates across threads, but
+        # each delta has exactly one writer, so no lock and no lost counts
+        delta = self._thread_delta()
+        delta.games_started += 1
+        if difficulty == "easy":
+            delta.easy_started += 1
+        elif difficulty == "hard":
+            delta.hard_started += 1
+        else:
+            delta.medium_started += 1
+        self._stats_dirty = True
+
+        # Lazy housekeeping: every _PRUNE_EVERY games, sweep old finished
+        # games out of the active shards
+        if seq % _PRUNE_EVERY == 0:
+            self.prune_finished()
         return game
 
     def get(self, game_id: str) -> Optional[Game]:
-        with self._lock:
-            return self._games.get(game_id)
+        # Lock-free read: shard maps are replaced wholesale on write (copy-
+        # on-write), and rebinding a list slot is atomic under the GIL
+        game = self._shard_maps[self._shard(game_id)].get(game_id)
+        if game is None:
+            # Archived games are still readable
+            game = self._archive.get(game_id)
+        return game
 
     def guess(self, game_id: str, attempt: Code) -> Optional[Game]:
-        with self._lock:
-            game = self._games.get(game_id)
+        # One conversion at the boundary; everything downstream (scoring,
+        # win check, history) shares the same immutable tuple
+        attempt = tuple(attempt)
+        i = self._shard(game_id)
+        with self._shard_locks[i]:
+            game = self._shard_maps[i].get(game_id)
             if game is None:
-                return None
+                # Archived games are finished by definition; extra guesses
+                # just get the final state back
+                return self._archive.get(game_id)
 
             if game.status != "in_progress":
                 # If game already ended, just return it (ignore extra guesses)
                 return game
 
             # --- length guard ---
-            if len(game.secret) != len(attempt):
-                raise ValueError(f"Guess must have exactly {len(game.secret)} digits for this game.")
-
-            old_status = game.status
+            if game.code_length != len(attempt):
+                raise ValueError(f"Guess must have exactly {game.code_length} digits for this game.")
+
+            # Get the feedback using the engine. The length guard above
+            # already matched attempt against code_length, so dispatch
+            # straight to the length-specialized scorer when one exists.
+            scorer = scorer_for(game.code_length)
+            if scorer is not None:
+                correct_numbers, correct_positions = scorer(game.secret, attempt)
+            else:
+                correct_numbers, correct_positions = score_guess(game.secret, attempt)
 
-            # Get the feedback using the engine
-            result = score_guess(game.secret, attempt)
-            correct_numbers = result[0]
-            correct_positions = result[1]
+            # One clock read covers both the history entry and updated_at
+            now = time_ns()
 
-            # Build a message without revealing which digits are correct
-            if correct_numbers == 0 and correct_positions == 0:
-                msg = "all incorrect"
-            else:
-                msg = (
-                    str(correct_numbers)
-                    + " correct number(s) and "
-                    + str(correct_positions)
-                    + " correct location(s)"
-                )
-
-            # Save to history
-            entry = GuessEntry(
-                guess=attempt,
-                correct_numbers=correct_numbers,
-                correct_positions=correct_positions,
-                message=msg,
-                timestamp=time(),
-            )
-            game.history.append(entry)
+            # Save to history: fill the next pooled entry in place instead
+            # of allocating a new one (entries are write-once; nothing reads
+            # a slot until n_entries moves past it)
+            entry = game.history[game.n_entries]
+            entry.guess = attempt
+            entry.correct_numbers = correct_numbers
+            entry.correct_positions = correct_positions
+            entry.timestamp = now
+            game.n_entries += 1
 
             # Update attempts and status
             game.attempts_left -= 1
 
-            if is_win(game.secret, attempt):
+            # A win is simply every position correct — the score we already
+            # have answers that without touching the codes again
+            if correct_positions == game.code_length:
                 game.status = "won"
             else:
                 if game.attempts_left <= 0:
                     game.status = "lost"
 
-            game.updated_at = time()
+            game.updated_at = now
+
+            # The early return above guarantees we started in_progress, so
+            # any non-in_progress status here means this guess ended the game
+            ended = game.status != "in_progress"
+            if ended:
+                game.finished_at = now
 
-            # Update scoreboard exactly once when we detect a transition
-            # If we moved from "in_progress" to either "won" or "lost", update stats now.
-            if old_status == "in_progress" and game.status in ("won", "lost"):
-                self._update_stats_on_end(game, won=(game.status == "won"))
+        # Update scoreboard exactly once per game, after the shard lock is
+        # released so stats contention never blocks other games in the shard.
+        if ended:
+            self._update_stats_on_end(game, won=(game.status == "won"))
 
-            return game
+        return game
+
+    def prune_finished(self, older_than_ns: int = _PRUNE_AGE_NS) -> None:
+        """Move finished games older than the cutoff into the archive."""
+        cutoff = time_ns() - older_than_ns
+        for i in range(_SHARD_COUNT):
+            with self._shard_locks[i]:
+                games = self._shard_maps[i]
+                moved = [(gid, g) for gid, g in games.items()
+                         if g.finished_at and g.finished_at < cutoff]
+                if moved:
+                    # Archive first, then swap the shard map: readers check
+                    # the shard before the archive, so a game briefly in
+                    # both maps is harmless, while a game in neither would
+                    # 404. The archive lock nests inside the shard lock
+                    # only here and is never taken the other way around.
+                    with self._archive_lock:
+                        self._archive.update(moved)
+                    kept = {gid: g for gid, g in games.items()
+                            if not (g.finished_at and g.finished_at < cutoff)}
+                    self._shard_maps[i] = kept
+
+    def _thread_delta(self) -> Stats:
+        """This thread's private Stats delta, (re)created after a reset."""
+        store = self._local
+        delta = getattr(store, "stats", None)
+        if delta is None or store.epoch != self._stats_epoch:
+            delta = Stats()
+            with self._stats_lock:
+                self._thread_stats.append(delta)
+                store.epoch = self._stats_epoch
+            store.stats = delta
+        return delta
 
     # Extension 2: Helper updates scoreboard exactly once per game
     def _update_stats_on_end(self, game: Game, won: bool) -> None:
+        delta = self._thread_delta()
         if won:
-            self._stats.games_won += 1
+            delta.games_won += 1
 
             # per-difficulty wins
             if game.difficulty == "easy":
-                self._stats.easy_won += 1
+                delta.easy_won += 1
             elif game.difficulty == "hard":
-                self._stats.hard_won += 1
+                delta.hard_won += 1
             else:
-                self._stats.medium_won += 1
-
-            # streaks
-            self._stats.current_streak += 1
-            if self._stats.current_streak > self._stats.best_streak:
-                self._stats.best_streak = self._stats.current_streak
+                delta.medium_won += 1
 
             # guesses used
             guesses_used = game.initial_attempts - game.attempts_left
-            self._stats.total_guesses_in_wins += guesses_used
-            if self._stats.fastest_win_attempts is None or guesses_used < self._stats.fastest_win_attempts:
-                self._stats.fastest_win_attempts = guesses_used
+            delta.total_guesses_in_wins += guesses_used
+            if delta.fastest_win_attempts is None or guesses_used < delta.fastest_win_attempts:
+                delta.fastest_win_attempts = guesses_used
+
+            # streaks depend on cross-thread ordering, so they stay shared
+            with self._stats_lock:
+                self._stats.current_streak += 1
+                if self._stats.current_streak > self._stats.best_streak:
+                    self._stats.best_streak = self._stats.current_streak
+            self._stats_dirty = True
         else:
-            self._stats.games_lost += 1
-            self._stats.current_streak = 0
+            delta.games_lost += 1
+            with self._stats_lock:
+                self._stats.current_streak = 0
+        self._stats_dirty = True
 
     # Extension 2: public API for stats
     def get_stats(self) -> Stats:
-        return self._stats
+        # Serve the cached snapshot while nothing has changed
+        if not self._stats_dirty and self._stats_cache is not None:
+            return self._stats_cache
+
+        # Merge the shared Stats with every thread's delta into a snapshot
+        self._stats_dirty = False
+        with self._stats_lock:
+            merged = replace(self._stats)
+            for d in self._thread_stats:
+                merged.games_started += d.games_started
+                merged.easy_started += d.easy_started
+                merged.medium_started += d.medium_started
+                merged.hard_started += d.hard_started
+                merged.games_won += d.games_won
+                merged.games_lost += d.games_lost
+                merged.easy_won += d.easy_won
+                merged.medium_won += d.medium_won
+                merged.hard_won += d.hard_won
+                merged.total_guesses_in_wins += d.total_guesses_in_wins
+                if d.fastest_win_attempts is not None and (
+                    merged.fastest_win_attempts is None
+                    or d.fastest_win_attempts < merged.fastest_win_attempts
+                ):
+                    merged.fastest_win_attempts = d.fastest_win_attempts
+        self._stats_cache = merged
+        return merged
 
     def reset_stats(self) -> None:
-        with self._lock:
+        with self._stats_lock:
             self._stats = Stats()
+            # Orphan existing per-thread deltas; threads re-register lazily
+            self._stats_epoch += 1
+            self._thread_stats.clear()
+        self._stats_cache = None
+        self._stats_dirty = True
 
     # Extension 3: Generate one hint (position, digit) for a game
     def give_hint(self, game_id: str):
@@ -198,9 +386,13 @@ class GameStore:
             ("already_used", None) if hint was used
             ("not_found", None) if no game
         """
-        with self._lock:
-            game = self._games.get(game_id)
+        i = self._shard(game_id)
+        with self._shard_locks[i]:
+            game = self._shard_maps[i].get(game_id)
             if game is None:
+                # Archived games are finished; no hints for them either
+                if game_id in self._archive:
+                    return ("finished", None)
                 return ("not_found", None)
 
             # If the game already ended, we do not provide a hint
@@ -211,32 +403,26 @@ class GameStore:
             if game.hint_used:
                 return ("already_used", None)
 
-            # Choose a random position we have not revealed yet
-            total = len(game.secret)
+            # Choose a random position we have not revealed yet: draw once
+            # from the maintained candidate list and swap-pop it out. No
+            # rejection sampling, bounded work even if the hint budget grows.
+            # Which position gets revealed is not security-sensitive (the
+            # player is told the answer), so the cheap Mersenne Twister
+            # beats an os.urandom read per hint; secrets stays for ids.
+            candidates = game.unrevealed
 
             # Safety: if somehow everything was revealed
-            if len(game.revealed_positions) >= total:
+            if not candidates:
                 return ("already_used", None)
 
-            # Continue until we find an index not yet revealed
-            while True:
-                index = randbelow(total) # 0 -> total-1
-                # check if this index is already revealed
-                already_revealed = False
-                j = 0
-                while j < len(game.revealed_positions):
-                    if game.revealed_positions[j] == index:
-                        already_revealed = True
-                        break
-                    j += 1
-
-                if not already_revealed:
-                    break
+            j = randrange(len(candidates))
+            candidates[j], candidates[-1] = candidates[-1], candidates[j]
+            index = candidates.pop()
 
             # Mark it used and record the index
             game.hint_used = True
             game.revealed_positions.append(index)
-            game.updated_at = time()
+            game.updated_at = time_ns()
 
             digit = game.secret[index]
             return ("ok", (index, digit))
@@ -2,9 +2,9 @@
 Labels for clarity.
 """
 
-from typing import List, Literal
+from typing import Literal, Tuple
 
 Digit = int  # 0 -> 7
-Code = List[Digit]  # 4 digit guess
+Code = Tuple[Digit, ...]  # immutable 3-5 digit code; tuples hash and compare in C
 GameStatus = Literal["in_progress", "won", "lost"]
 Difficulty = Literal["easy", "medium", "hard"]
@@ -25,7 +25,8 @@ def test_store_create_and_guess_basic():
     store.guess(game_id, [0,0,0,0])
     game_after = store.get(game_id)
     assert game_after.attempts_left == 2
-    assert len(game_after.history) == 1
+    assert game_after.n_entries == 1
+    assert len(game_after.entries) == 1
     assert game_after.status == "in_progress"
 
     # Winning guess ends the game